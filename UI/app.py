@@ -6,8 +6,12 @@ import streamlit as st
 import pandas as pd
 from datetime import date, datetime, time
 
-from spike_backend import fetch_incidents_for_range, generate_excel, IST
-from open_alerts_backend import fetch_all_open_alerts, generate_excel as open_generate_excel
+from spike_backend import iter_incidents_for_range, generate_excel, sort_rows, IST
+from open_alerts_backend import iter_open_alerts, generate_excel as open_generate_excel
+from spike_client import transfer_report
+from single_flight import flight_report
+from workload import workload_summary, assignee_incidents, indexed_teams
+import team_config
 
 # -------------------------------------------------
 # PAGE CONFIG
@@ -26,6 +30,7 @@ defaults = {
     "open_alert_rows": None,
     "incident_selected_teams": ["All Teams"],
     "open_selected_teams": ["All Teams"],
+    "workload_selected_teams": ["All Teams"],
 }
 
 for k, v in defaults.items():
@@ -38,10 +43,80 @@ for k, v in defaults.items():
 st.sidebar.image("logo.png", width=180)
 st.sidebar.title("📌 Navigation")
 
-page = st.sidebar.radio("Select View", ["Incident Report", "Open Alerts"])
+page = st.sidebar.radio("Select View", ["Incident Report", "Open Alerts", "On-call Load"])
+
+with st.sidebar.expander("⚙️ Teams"):
+    try:
+        cfg = team_config.current()
+        st.dataframe(pd.DataFrame([
+            {
+                "Team Name": team_name,
+                "Enabled": s["enabled"],
+                "Priority": s["priority"],
+                "Poll Interval (s)": s["poll_interval"],
+                "API Key": s["key"],
+            }
+            for team_name, s in cfg.settings.items()
+        ]), hide_index=True)
+        if team_config.last_error:
+            st.warning(team_config.last_error)
+    except team_config.ConfigError as e:
+        st.error(str(e))
+    st.caption(f"Config file: {team_config.config_path()}")
+
+with st.sidebar.expander("📡 Transfer Stats"):
+    stats = transfer_report()
+    if stats:
+        st.dataframe(pd.DataFrame(stats), hide_index=True)
+    else:
+        st.caption("No Spike requests yet")
+
+with st.sidebar.expander("🔗 Coalesced Calls"):
+    flights = flight_report()
+    if flights:
+        st.dataframe(pd.DataFrame(flights), hide_index=True)
+    else:
+        st.caption("No calls yet")
 
 st.title("Spike NOC Dashboard")
 
+# -------------------------------------------------
+# PROGRESSIVE FETCH
+# -------------------------------------------------
+def stream_rows(batches, label):
+    rows = []
+    failed = []
+    status = st.empty()
+    table = st.empty()
+
+    try:
+        for team_name, team_rows in batches:
+            if team_rows is None:
+                failed.append(team_name)
+                continue
+            rows.extend(team_rows)
+            # only the newest team's batch is rendered, so each update costs O(batch)
+            status.caption(f"⏳ {team_name}: {len(team_rows)} {label} ({len(rows)} so far)")
+            if team_rows:
+                table.dataframe(pd.DataFrame(team_rows), use_container_width=True, hide_index=True)
+    except (team_config.ConfigError, TimeoutError) as e:
+        st.error(f"⚠️ {e}")
+        return None
+    finally:
+        status.empty()
+        table.empty()
+
+    if failed:
+        st.warning(f"⚠️ Could not fetch {label} for: {', '.join(failed)}")
+    sort_rows(rows)
+    return rows
+
+# Feeds the exporters one row at a time instead of a list of dicts
+def iter_records(df):
+    columns = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, values))
+
 # =================================================
 # INCIDENT REPORT
 # =================================================
@@ -85,8 +160,9 @@ if page == "Incident Report":
         if from_dt > to_dt:
             st.error("From datetime cannot be after To datetime")
         else:
-            with st.spinner("Fetching incidents..."):
-                st.session_state.incident_rows = fetch_incidents_for_range(from_dt, to_dt)
+            rows = stream_rows(iter_incidents_for_range(from_dt, to_dt), "incidents")
+            if rows is not None:
+                st.session_state.incident_rows = rows
 
     # ---------------- DISPLAY DATA ----------------
     if st.session_state.incident_rows is not None:
@@ -126,10 +202,8 @@ if page == "Incident Report":
             st.dataframe(df, use_container_width=True, hide_index=True)
 
             # Excel matches UI
-            excel_rows = df.to_dict(orient="records")
-
             file = generate_excel(
-                excel_rows,
+                iter_records(df),
                 datetime.combine(st.session_state.from_date, st.session_state.from_time).replace(tzinfo=IST),
                 datetime.combine(st.session_state.to_date, st.session_state.to_time).replace(tzinfo=IST)
             )
@@ -149,8 +223,9 @@ if page == "Open Alerts":
     st.subheader("🚨 Open Alerts (All Teams / Per Team)")
 
     if st.button("Refresh Open Alerts"):
-        with st.spinner("Fetching open alerts..."):
-            st.session_state.open_alert_rows = fetch_all_open_alerts()
+        rows = stream_rows(iter_open_alerts(), "open alerts")
+        if rows is not None:
+            st.session_state.open_alert_rows = rows
 
     if st.session_state.open_alert_rows is not None:
 
@@ -186,7 +261,7 @@ if page == "Open Alerts":
             st.success(f"Total Open Alerts: {len(df)}")
             st.dataframe(df, use_container_width=True, hide_index=True)
 
-            file = open_generate_excel(df.to_dict(orient="records"))
+            file = open_generate_excel(iter_records(df))
 
             st.download_button(
                 "📥 Download Open Alerts Excel",
@@ -194,3 +269,62 @@ if page == "Open Alerts":
                 file_name=file,
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
+
+# =================================================
+# ON-CALL LOAD
+# =================================================
+if page == "On-call Load":
+
+    st.subheader("👥 On-call Load (Open Alerts per Assignee)")
+
+    if st.button("Refresh Open Alerts", key="workload_refresh"):
+        rows = stream_rows(iter_open_alerts(), "open alerts")
+        if rows is not None:
+            st.session_state.open_alert_rows = rows
+
+    teams = indexed_teams()
+
+    if not teams:
+        st.info("No open alerts loaded yet — press Refresh Open Alerts")
+    else:
+        team_options = ["All Teams"] + teams
+
+        st.session_state.workload_selected_teams = st.multiselect(
+            "Select Team(s)",
+            team_options,
+            default=[t for t in st.session_state.workload_selected_teams if t in team_options]
+        )
+
+        # 🚫 No team selected
+        if not st.session_state.workload_selected_teams:
+            st.warning("⚠️ Please select at least one team")
+            st.stop()
+
+        selected = None
+        if "All Teams" not in st.session_state.workload_selected_teams:
+            selected = st.session_state.workload_selected_teams
+
+        rows = workload_summary(selected)
+
+        if not rows:
+            st.success("🎉 No open alerts found")
+        else:
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Assignees", len(rows))
+            c2.metric("Open (per assignee)", sum(r["Open"] for r in rows))
+            c3.metric("Unacked (per assignee)", sum(r["Unacked"] for r in rows))
+
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+            assignee = st.selectbox(
+                "Show incidents for",
+                [r["Assignee"] for r in rows],
+                index=None,
+                placeholder="Select an assignee"
+            )
+            if assignee:
+                st.dataframe(
+                    pd.DataFrame(assignee_incidents(assignee, selected)),
+                    use_container_width=True,
+                    hide_index=True
+                )
@@ -3,18 +3,19 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from openpyxl import Workbook
 from dotenv import load_dotenv
-import os
 import time
 
+from spike_client import get_team_incidents, SPIKE_API_URL, REQUEST_TIMEOUT, USER_RETRY_AFTER
+from single_flight import single_flight, single_flight_iter
+from sharding import sharding_enabled, iter_sharded
+import team_config
+from workload import update_team, retain_teams
+
+# teams and API keys are read lazily through team_config.current()
 load_dotenv()
 
-SPIKE_API_KEY = os.getenv("SPIKE_API_KEY")
-teams = {k.replace("TEAM_", ""): v for k, v in os.environ.items() if k.startswith("TEAM_")}
 IST = ZoneInfo("Asia/Kolkata")
 
-if not SPIKE_API_KEY or not teams:
-    raise RuntimeError("SPIKE_API_KEY or TEAM_* missing")
-
 def utc_to_ist(utc_str):
     if not utc_str:
         return None
@@ -24,8 +25,10 @@ def ist_str(dt):
     return dt.strftime("%Y-%m-%d %H:%M:%S") if dt else ""
 
 user_cache = {}
+# uid -> time.monotonic() of the last failed lookup
+failed_users = {}
 
-def resolve_user(user_field, team_id):
+def resolve_user(user_field, team_id, api_key):
     if not user_field:
         return ""
     if isinstance(user_field, dict):
@@ -34,74 +37,122 @@ def resolve_user(user_field, team_id):
     uid = str(user_field)
     if uid in user_cache:
         return user_cache[uid]
+    failed_at = failed_users.get(uid)
+    if failed_at is not None and time.monotonic() - failed_at < USER_RETRY_AFTER:
+        return uid
+
+    name = single_flight("user", uid, _lookup_user, uid, team_id, api_key)
+    if name is None:
+        # lookup failed; show the id, and don't wait on /users again for
+        # every note by this user until USER_RETRY_AFTER has passed
+        failed_users[uid] = time.monotonic()
+        return uid
+    failed_users.pop(uid, None)
+    user_cache[uid] = name
+    return name
 
-    r = requests.get(
-        f"https://api.spike.sh/users/{uid}",
-        headers={"x-api-key": SPIKE_API_KEY, "x-team-id": team_id}
-    )
+def _lookup_user(uid, team_id, api_key):
+    try:
+        r = requests.get(
+            f"{SPIKE_API_URL}/users/{uid}",
+            headers={"x-api-key": api_key, "x-team-id": team_id},
+            timeout=REQUEST_TIMEOUT
+        )
+    except requests.RequestException:
+        return None
 
     name = uid
     if r.status_code == 200:
         u = r.json()
         name = f"{u.get('firstName','')} {u.get('lastName','')}".strip() or u.get("email", uid)
 
-    user_cache[uid] = name
     time.sleep(0.1)
     return name
 
 def fetch_all_open_alerts():
+    rows = [row for _, team_rows in iter_open_alerts() if team_rows for row in team_rows]
+    sort_rows(rows)
+    return rows
+
+# Returns None if the team's listing could not be fetched
+def _team_open_alert_rows(team_name, team_id, api_key, poll_interval):
     rows = []
 
-    for team_name, team_id in teams.items():
-        headers = {"x-api-key": SPIKE_API_KEY, "x-team-id": team_id}
-        resp = requests.get("https://api.spike.sh/incidents", headers=headers)
-        if resp.status_code != 200:
+    incidents = get_team_incidents(team_name, team_id, api_key, poll_interval)
+    if incidents is None:
+        return None
+
+    for inc in incidents:
+        if inc.get("RES_at"):
             continue
 
-        incidents = resp.json().get("incidents", resp.json())
-
-        for inc in incidents:
-            if inc.get("RES_at"):
-                continue
-
-            nack_dt = utc_to_ist(inc.get("NACK_at"))
-            grouped = inc.get("groupedIncident", {})
-            notes = []
-
-            for note in grouped.get("notes", []):
-                note_dt = utc_to_ist(note.get("createdAt"))
-                if note_dt:
-                    user = resolve_user(note.get("user"), team_id)
-                    notes.append(f"{ist_str(note_dt)} | {user}: {note.get('content','').replace(chr(10),' ')}")
-
-            rows.append({
-                "Team Name": team_name,
-                "Counter ID": inc.get("counterId"),
-                "Message": inc.get("message"),
-                "Assignee Email": ", ".join(a.get("email","") for a in inc.get("assignee", [])),
-                "Priority": inc.get("metadata", {}).get("priority"),
-                "Status": inc.get("status"),
-                "Source": inc.get("integration", {}).get("name"),
-                "Created (IST)": ist_str(nack_dt),
-                "ACK At (IST)": ist_str(utc_to_ist(inc.get("ACK_at"))),
-                "Notes": "\n".join(notes)
-            })
+        nack_dt = utc_to_ist(inc.get("NACK_at"))
+        grouped = inc.get("groupedIncident", {})
+        notes = []
+
+        for note in grouped.get("notes", []):
+            note_dt = utc_to_ist(note.get("createdAt"))
+            if note_dt:
+                user = resolve_user(note.get("user"), team_id, api_key)
+                notes.append(f"{ist_str(note_dt)} | {user}: {note.get('content','').replace(chr(10),' ')}")
+
+        rows.append({
+            "Team Name": team_name,
+            "Counter ID": inc.get("counterId"),
+            "Message": inc.get("message"),
+            "Assignee Email": ", ".join(a.get("email","") for a in inc.get("assignee", [])),
+            "Priority": inc.get("metadata", {}).get("priority"),
+            "Status": inc.get("status"),
+            "Source": inc.get("integration", {}).get("name"),
+            "Created (IST)": ist_str(nack_dt),
+            "ACK At (IST)": ist_str(utc_to_ist(inc.get("ACK_at"))),
+            "Notes": "\n".join(notes)
+        })
 
+    return rows
+
+# Yields (team_name, rows) per team as soon as that team is done, each
+# batch already sorted latest first; rows is None when the team's listing
+# failed. Concurrent callers share one fetch and see the same batches.
+def iter_open_alerts():
+    return single_flight_iter("open_alerts", None, _iter_open_alerts)
+
+def _iter_open_alerts():
+    cfg = team_config.current().require()
+    team_args = {
+        team_name: (team_id, cfg.api_key_for(team_name), cfg.poll_interval(team_name))
+        for team_name, team_id in cfg.teams.items()
+    }
+
+    if sharding_enabled():
+        batches = iter_sharded(_team_open_alert_rows, team_args)
+    else:
+        batches = ((team_name, _team_open_alert_rows(team_name, *args)) for team_name, args in team_args.items())
+
+    for team_name, team_rows in batches:
+        if team_rows is not None:
+            sort_rows(team_rows)
+            # a failed listing keeps the team's last known workload
+            update_team(team_name, team_rows)
+        yield team_name, team_rows
+
+    retain_teams(cfg.teams)
+
+def sort_rows(rows):
     # 🔥 SORT BY CREATED TIME
     rows.sort(
         key=lambda x: datetime.strptime(x["Created (IST)"], "%Y-%m-%d %H:%M:%S"),
         reverse=True
     )
 
-    return rows
-
 def generate_excel(rows):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Open Alerts"
+    # write-only mode streams rows to disk instead of holding the sheet in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Open Alerts")
 
-    ws.append(list(rows[0].keys()))
-    for r in rows:
+    for i, r in enumerate(rows):
+        if i == 0:
+            ws.append(list(r.keys()))
         ws.append(list(r.values()))
 
     file_name = "spike_open_alerts_all_teams.xlsx"
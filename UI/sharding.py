@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import spike_client
+import single_flight
+
+# -------------------------------------------------
+# ENV
+# -------------------------------------------------
+# SPIKE_SHARD_PROCESSES=N -> fetch/parse teams in N worker processes (0/1 = in-process)
+SHARD_PROCESSES = int(os.getenv("SPIKE_SHARD_PROCESSES") or 0)
+
+# -------------------------------------------------
+# SHARDS
+# -------------------------------------------------
+# One single-worker pool per shard. A team stays on the shard it was first
+# given, so it keeps hitting the same worker (and its warm ETag / user
+# caches) while other teams come and go; new teams go to the least loaded
+# shard and removed teams free their slot.
+_shards = []
+# team_name -> shard index
+_assignment = {}
+_lock = threading.Lock()
+
+# Workers come from a forkserver rather than a fork of the Streamlit
+# process, which could copy a lock held by another session's thread.
+def _new_pool():
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver"))
+
+def _shard_assignment(team_names):
+    with _lock:
+        if not _shards:
+            _shards.extend(_new_pool() for _ in range(SHARD_PROCESSES))
+
+        for team_name in [t for t in _assignment if t not in team_names]:
+            del _assignment[team_name]
+
+        load = [0] * len(_shards)
+        for shard in _assignment.values():
+            load[shard] += 1
+        for team_name in sorted(t for t in team_names if t not in _assignment):
+            shard = load.index(min(load))
+            _assignment[team_name] = shard
+            load[shard] += 1
+
+        return {team_name: _assignment[team_name] for team_name in team_names}
+
+# A worker that died (OOM, kill) leaves its pool broken for good, so swap
+# in a new one unless another fetch already did.
+def _replace_shard(shard, pool):
+    with _lock:
+        if _shards[shard] is pool:
+            _shards[shard] = _new_pool()
+            pool.shutdown(wait=False)
+        return _shards[shard]
+
+def _submit(shard, fn, team_name, args):
+    pool = _shards[shard]
+    try:
+        return pool.submit(_run_team, fn, team_name, *args), pool
+    except BrokenProcessPool:
+        pool = _replace_shard(shard, pool)
+        return pool.submit(_run_team, fn, team_name, *args), pool
+
+def _run_team(fn, team_name, *args):
+    rows = fn(team_name, *args)
+    return rows, spike_client.transfer_stats.get(team_name), single_flight.flight_stats
+
+def sharding_enabled():
+    return SHARD_PROCESSES > 1
+
+# fn(team_name, *args) must be a module-level function returning a list of
+# rows, or None if the team failed. Yields (team_name, rows) in completion
+# order; teams whose worker died come back as (team_name, None).
+def iter_sharded(fn, team_args):
+    assignment = _shard_assignment(team_args)
+    futures = {}
+    for team_name, args in team_args.items():
+        shard = assignment[team_name]
+        future, pool = _submit(shard, fn, team_name, args)
+        futures[future] = (team_name, shard, pool)
+
+    for future in as_completed(futures):
+        team_name, shard, pool = futures[future]
+        try:
+            rows, stats, flights = future.result()
+        except BrokenProcessPool:
+            _replace_shard(shard, pool)
+            yield team_name, None
+            continue
+        if stats:
+            # worker counters are cumulative for the team, so replace rather than add
+            with spike_client._lock:
+                spike_client.transfer_stats[team_name] = stats
+        single_flight.merge_worker_stats(f"shard {assignment[team_name]}", flights)
+        yield team_name, rows
@@ -0,0 +1,156 @@
+import threading
+
+# Streamlit runs every session as a thread in the same process, so concurrent
+# identical fetches can share one in-flight call instead of each hitting Spike.
+
+# Followers stop waiting after this long and run the call themselves, so a
+# stuck leader can't hold every coalesced session hostage.
+WAIT_TIMEOUT = 120
+
+_inflight = {}
+_lock = threading.Lock()
+
+# group -> {"calls", "executed", "coalesced", "wait_timeouts"}
+flight_stats = {}
+# worker name -> that worker process's flight_stats (sharded mode)
+worker_flight_stats = {}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _stats(group):
+    return flight_stats.setdefault(group, {"calls": 0, "executed": 0, "coalesced": 0, "wait_timeouts": 0})
+
+# -------------------------------------------------
+# SINGLE FLIGHT
+# -------------------------------------------------
+def single_flight(group, key, fn, *args, wait_timeout=WAIT_TIMEOUT):
+    with _lock:
+        stats = _stats(group)
+        stats["calls"] += 1
+        call = _inflight.get((group, key))
+        leader = call is None
+        if leader:
+            call = _inflight[(group, key)] = _Call()
+            stats["executed"] += 1
+        else:
+            stats["coalesced"] += 1
+
+    if not leader:
+        if not call.done.wait(wait_timeout):
+            with _lock:
+                stats["wait_timeouts"] += 1
+            return fn(*args)
+        if call.error is not None:
+            raise call.error
+        # followers get their own list so callers can't mutate each other's rows
+        return list(call.result) if isinstance(call.result, list) else call.result
+
+    try:
+        call.result = fn(*args)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            del _inflight[(group, key)]
+        call.done.set()
+
+
+# -------------------------------------------------
+# SINGLE FLIGHT (STREAMING)
+# -------------------------------------------------
+class _Stream:
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+
+def _produce(stream, flight_key, fn, args):
+    try:
+        for item in fn(*args):
+            with stream.cond:
+                stream.items.append(item)
+                stream.cond.notify_all()
+    except Exception as e:
+        stream.error = e
+    finally:
+        with _lock:
+            # a timed-out stream was already detached, maybe replaced by a retry
+            if _inflight.get(flight_key) is stream:
+                del _inflight[flight_key]
+        with stream.cond:
+            stream.done = True
+            stream.cond.notify_all()
+
+
+def _consume(stream, flight_key, stats, wait_timeout):
+    i = 0
+    while True:
+        with stream.cond:
+            while i >= len(stream.items) and not stream.done:
+                if not stream.cond.wait(wait_timeout):
+                    with _lock:
+                        stats["wait_timeouts"] += 1
+                        # detach the stalled producer so the next call starts a fresh one
+                        if _inflight.get(flight_key) is stream:
+                            del _inflight[flight_key]
+                    raise TimeoutError(f"No data from Spike for {wait_timeout}s")
+            if i < len(stream.items):
+                item = stream.items[i]
+                i += 1
+            elif stream.error is not None:
+                raise stream.error
+            else:
+                return
+        yield item
+
+
+# Like single_flight, for generators: one background thread runs fn(*args)
+# and every concurrent caller with the same key (the first one included)
+# iterates the items it has produced so far, then waits for the rest.
+# wait_timeout bounds the wait for each next item; when it runs out the
+# stream is detached, so a retry starts a fresh producer instead of
+# joining the stalled one.
+def single_flight_iter(group, key, fn, *args, wait_timeout=WAIT_TIMEOUT):
+    flight_key = (group, key)
+    with _lock:
+        stats = _stats(group)
+        stats["calls"] += 1
+        stream = _inflight.get(flight_key)
+        if stream is None:
+            stream = _inflight[flight_key] = _Stream()
+            stats["executed"] += 1
+            threading.Thread(target=_produce, args=(stream, flight_key, fn, args), daemon=True).start()
+        else:
+            stats["coalesced"] += 1
+
+    return _consume(stream, flight_key, stats, wait_timeout)
+
+
+# Worker counters are cumulative, so each snapshot replaces the last one.
+def merge_worker_stats(worker, stats):
+    with _lock:
+        worker_flight_stats[worker] = stats
+
+
+def flight_report():
+    with _lock:
+        totals = {}
+        for stats in [flight_stats, *worker_flight_stats.values()]:
+            for group, counters in stats.items():
+                total = totals.setdefault(group, dict.fromkeys(counters, 0))
+                for name, value in counters.items():
+                    total[name] = total.get(name, 0) + value
+        return [
+            {"Call": group, **stats}
+            for group, stats in sorted(totals.items())
+        ]
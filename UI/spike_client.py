@@ -0,0 +1,135 @@
+import requests
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+from single_flight import single_flight
+
+# orjson (requirements.txt) decodes large incident listings several times
+# faster; fall back to the stdlib decoder if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# urllib3 only decodes br bodies when brotli (requirements.txt) is installed,
+# so only advertise br when it is
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+load_dotenv()
+
+SPIKE_API_URL = os.getenv("SPIKE_API_URL", "https://api.spike.sh").rstrip("/")
+INCIDENTS_URL = f"{SPIKE_API_URL}/incidents"
+LARGE_BODY_BYTES = 256 * 1024
+# (connect, read) seconds for every Spike request
+REQUEST_TIMEOUT = (5, float(os.getenv("SPIKE_REQUEST_TIMEOUT") or 30))
+# seconds a failed user lookup is remembered before it is tried again
+USER_RETRY_AFTER = 60
+
+session = requests.Session()
+session.headers.update({
+    "Accept": "application/json",
+    "Accept-Encoding": ACCEPT_ENCODING,
+})
+
+# team_id -> {"etag", "last_modified", "incidents", "bytes", "fetched_at"}
+incident_cache = {}
+# team_name -> transfer counters
+transfer_stats = {}
+_lock = threading.Lock()
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def _decode(resp):
+    if orjson and len(resp.content) >= LARGE_BODY_BYTES:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+def _wire_bytes(resp):
+    # Content-Length is the compressed size; resp.content is already decoded
+    length = resp.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else len(resp.content)
+
+def _stats(team_name):
+    return transfer_stats.setdefault(team_name, {
+        "requests": 0,
+        "not_modified": 0,
+        "within_poll_interval": 0,
+        "bytes_received": 0,
+        "bytes_saved_304": 0,
+        "bytes_saved_compression": 0,
+    })
+
+# -------------------------------------------------
+# INCIDENT LISTING (CONDITIONAL GET)
+# -------------------------------------------------
+# Returns the team's incident list, or None if the request failed.
+# A 304 reuses the parsed payload cached from the previous 200, and so does
+# any call within poll_interval seconds of the last answer from Spike.
+def get_team_incidents(team_name, team_id, api_key, poll_interval=0):
+    return single_flight(
+        "team_incidents", (team_id, api_key),
+        _get_team_incidents, team_name, team_id, api_key, poll_interval
+    )
+
+def _get_team_incidents(team_name, team_id, api_key, poll_interval):
+    headers = {"x-api-key": api_key, "x-team-id": team_id}
+
+    with _lock:
+        cached = incident_cache.get(team_id)
+        if cached and poll_interval and time.monotonic() - cached["fetched_at"] < poll_interval:
+            _stats(team_name)["within_poll_interval"] += 1
+            return cached["incidents"]
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        resp = session.get(INCIDENTS_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException:
+        return None
+
+    with _lock:
+        stats = _stats(team_name)
+        stats["requests"] += 1
+
+        if resp.status_code == 304 and cached:
+            stats["not_modified"] += 1
+            stats["bytes_saved_304"] += cached["bytes"]
+            cached["fetched_at"] = time.monotonic()
+            return cached["incidents"]
+
+    if resp.status_code != 200:
+        return None
+
+    payload = _decode(resp)
+    incidents = payload.get("incidents", payload) if isinstance(payload, dict) else payload
+    wire = _wire_bytes(resp)
+
+    with _lock:
+        stats["bytes_received"] += wire
+        stats["bytes_saved_compression"] += max(len(resp.content) - wire, 0)
+        incident_cache[team_id] = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "incidents": incidents,
+            "bytes": wire,
+            "fetched_at": time.monotonic(),
+        }
+
+    return incidents
+
+def transfer_report():
+    with _lock:
+        return [
+            {"Team Name": team_name, **stats}
+            for team_name, stats in sorted(transfer_stats.items())
+        ]
@@ -0,0 +1,210 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+# -------------------------------------------------
+# TEAM / API KEY CONFIG
+# -------------------------------------------------
+# Teams come from the environment (.env) and, optionally, a JSON file that
+# is re-read whenever it changes on disk:
+#
+#   {
+#     "api_keys": {"ops": "<key>"},
+#     "teams": {
+#       "NOC": {"id": "<team id>", "key": "ops", "enabled": true,
+#               "priority": 1, "poll_interval": 60}
+#     }
+#   }
+#
+# Environment:
+#   SPIKE_API_KEY                    default key
+#   TEAM_<NAME>=<team id>            team using the default key
+#   SPIKE_API_KEY_<K>=<key>          extra key named <K>
+#   SPIKE_KEY_TEAMS_<K>=NAME1,NAME2  teams that use SPIKE_API_KEY_<K>
+#   SPIKE_TEAMS_FILE                 JSON file (default teams.json next to this module)
+#
+# File entries override env entries with the same name. Lower priority is
+# fetched first; poll_interval (seconds) lets a team's last listing be reused
+# instead of asking Spike again.
+
+load_dotenv()
+
+CHECK_INTERVAL = 2.0
+DEFAULT_PRIORITY = 100
+
+log = logging.getLogger(__name__)
+
+
+class ConfigError(RuntimeError):
+    pass
+
+
+class TeamConfig:
+    def __init__(self, settings, api_keys):
+        self.settings = settings
+        self.api_keys = api_keys
+        self.teams = {
+            team_name: s["id"]
+            for team_name, s in sorted(settings.items(), key=lambda x: (x[1]["priority"], x[0]))
+            if s["enabled"]
+        }
+
+    def api_key_for(self, team_name):
+        key_name = self.settings[team_name]["key"]
+        return self.api_keys.get(key_name)
+
+    def poll_interval(self, team_name):
+        return self.settings[team_name]["poll_interval"]
+
+    def require(self):
+        if not self.teams:
+            raise ConfigError("No enabled teams: set TEAM_* or add teams to the config file")
+        missing = [t for t in self.teams if not self.api_key_for(t)]
+        if missing:
+            raise ConfigError(f"No Spike API key for team(s): {', '.join(missing)}")
+        return self
+
+
+def config_path():
+    return os.getenv("SPIKE_TEAMS_FILE") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "teams.json")
+
+
+def _number(name, value):
+    # bool is an int subclass, but "priority": true is a typo, not a priority
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    return int(number) if number.is_integer() else number
+
+def _flag(name, value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise ValueError(f"{name} must be true or false, got {value!r}")
+
+def _team(team_id, key="default", enabled=True, priority=DEFAULT_PRIORITY, poll_interval=0):
+    if not isinstance(key, str) or not key:
+        raise ValueError(f"key must be a key name, got {key!r}")
+    poll_interval = _number("poll_interval", poll_interval)
+    if poll_interval < 0:
+        raise ValueError(f"poll_interval must not be negative, got {poll_interval!r}")
+
+    return {
+        "id": str(team_id),
+        "key": key,
+        "enabled": _flag("enabled", enabled),
+        "priority": _number("priority", priority),
+        "poll_interval": poll_interval,
+    }
+
+
+def _from_env():
+    api_keys = {"default": os.getenv("SPIKE_API_KEY")}
+    settings = {
+        k.replace("TEAM_", ""): _team(v)
+        for k, v in os.environ.items() if k.startswith("TEAM_")
+    }
+
+    for k, v in os.environ.items():
+        if not k.startswith("SPIKE_KEY_TEAMS_"):
+            continue
+        key_name = k.replace("SPIKE_KEY_TEAMS_", "")
+        api_keys[key_name] = os.getenv("SPIKE_API_KEY_" + key_name)
+        for team_name in v.split(","):
+            if team_name.strip() in settings:
+                settings[team_name.strip()]["key"] = key_name
+
+    return settings, api_keys
+
+
+def _from_file(path, settings, api_keys):
+    with open(path) as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError("top level must be an object")
+    file_keys = data.get("api_keys", {})
+    teams = data.get("teams", {})
+    if not isinstance(file_keys, dict):
+        raise ValueError('"api_keys" must be an object')
+    if not isinstance(teams, dict):
+        raise ValueError('"teams" must be an object')
+    for key_name, key in file_keys.items():
+        if not isinstance(key, str) or not key:
+            raise ValueError(f"api key {key_name} must be a non-empty string")
+
+    api_keys.update(file_keys)
+    for team_name, team in teams.items():
+        if not isinstance(team, dict):
+            team = {"id": team}
+        team = dict(team)
+        if not team.get("id"):
+            raise ValueError(f"team {team_name} has no id")
+        try:
+            settings[team_name] = _team(team.pop("id"), **team)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"team {team_name}: {e}") from None
+
+# -------------------------------------------------
+# LAZY LOAD + RELOAD ON CHANGE
+# -------------------------------------------------
+_current = None
+_mtime = None
+_checked_at = 0.0
+_lock = threading.Lock()
+# why the file on disk was rejected, while the last good config is served
+last_error = None
+
+
+def _mtime_of(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _load(path, mtime):
+    settings, api_keys = _from_env()
+    if mtime is not None:
+        _from_file(path, settings, api_keys)
+    return TeamConfig(settings, api_keys)
+
+
+# Returns the current config, re-reading the file at most every
+# CHECK_INTERVAL seconds and only when its mtime changed. A broken file
+# keeps the last good config instead of taking the dashboard down, and is
+# logged and reported through last_error until it is fixed.
+def current():
+    global _current, _mtime, _checked_at, last_error
+
+    with _lock:
+        now = time.monotonic()
+        if _current is not None and now - _checked_at < CHECK_INTERVAL:
+            return _current
+        _checked_at = now
+
+        path = config_path()
+        mtime = _mtime_of(path)
+        if _current is not None and mtime == _mtime:
+            return _current
+
+        try:
+            _current = _load(path, mtime)
+            last_error = None
+        except (OSError, ValueError, TypeError) as e:
+            if _current is None:
+                raise ConfigError(f"Invalid team config {path}: {e}") from e
+            last_error = f"Ignoring invalid team config {path}: {e}"
+            log.warning(last_error)
+        _mtime = mtime
+        return _current
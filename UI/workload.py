@@ -0,0 +1,175 @@
+import threading
+from collections import Counter
+from datetime import datetime
+
+from zoneinfo import ZoneInfo
+
+IST = ZoneInfo("Asia/Kolkata")
+
+AGE_BUCKETS = [
+    ("< 1h", 1),
+    ("1-4h", 4),
+    ("4-24h", 24),
+    ("> 24h", None),
+]
+
+# -------------------------------------------------
+# ASSIGNEE INDEX
+# -------------------------------------------------
+# team_name -> {"signature": ..., "assignees": {email: aggregate}}
+# Built from open-alert rows as each team's batch arrives, so a refresh
+# only rebuilds the teams whose open alerts actually changed. Each
+# aggregate keeps counters for the summary plus the assignee's incidents.
+_index = {}
+_lock = threading.Lock()
+
+def _signature(rows):
+    return tuple(
+        (r["Counter ID"], r["Status"], r["Priority"], r["ACK At (IST)"], r["Assignee Email"], r["Message"])
+        for r in rows
+    )
+
+def _parse(ist_str):
+    return datetime.strptime(ist_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=IST) if ist_str else None
+
+def _team_aggregates(rows):
+    assignees = {}
+
+    for r in rows:
+        created = _parse(r["Created (IST)"])
+        acked = bool(r["ACK At (IST)"])
+        emails = [e.strip() for e in (r["Assignee Email"] or "").split(",") if e.strip()]
+
+        for email in emails or ["Unassigned"]:
+            agg = assignees.setdefault(email, {
+                "status": Counter(),
+                "priority": Counter(),
+                "created": [],
+                "unacked": 0,
+                "oldest_unacked": None,
+                "incidents": [],
+            })
+            agg["incidents"].append({
+                "Team Name": r["Team Name"],
+                "Counter ID": r["Counter ID"],
+                "Message": r["Message"],
+                "Priority": r["Priority"],
+                "Status": r["Status"],
+                "created": created,
+                "acked": acked,
+            })
+            agg["unacked"] += not acked
+            agg["status"][str(r["Status"] or "unknown")] += 1
+            agg["priority"][str(r["Priority"] or "none")] += 1
+            if created:
+                agg["created"].append(created)
+            if not acked and created and (agg["oldest_unacked"] is None or created < agg["oldest_unacked"][0]):
+                agg["oldest_unacked"] = (created, r["Team Name"], r["Counter ID"])
+
+    return assignees
+
+def update_team(team_name, rows):
+    signature = _signature(rows)
+    with _lock:
+        entry = _index.get(team_name)
+        if entry and entry["signature"] == signature:
+            return False
+
+    assignees = _team_aggregates(rows)
+    with _lock:
+        _index[team_name] = {"signature": signature, "assignees": assignees}
+    return True
+
+def retain_teams(team_names):
+    with _lock:
+        for team_name in [t for t in _index if t not in team_names]:
+            del _index[team_name]
+
+def indexed_teams():
+    with _lock:
+        return sorted(_index)
+
+# -------------------------------------------------
+# SUMMARY
+# -------------------------------------------------
+def _age_bucket(hours):
+    for label, limit in AGE_BUCKETS:
+        if limit is None or hours < limit:
+            return label
+
+def workload_summary(selected_teams=None, now=None):
+    now = now or datetime.now(IST)
+
+    with _lock:
+        team_entries = [
+            entry["assignees"] for team_name, entry in _index.items()
+            if selected_teams is None or team_name in selected_teams
+        ]
+
+    merged = {}
+    for assignees in team_entries:
+        for email, agg in assignees.items():
+            m = merged.setdefault(email, {
+                "status": Counter(),
+                "priority": Counter(),
+                "age": Counter(),
+                "unacked": 0,
+                "oldest_unacked": None,
+            })
+            m["unacked"] += agg["unacked"]
+            m["status"].update(agg["status"])
+            m["priority"].update(agg["priority"])
+            for created in agg["created"]:
+                m["age"][_age_bucket((now - created).total_seconds() / 3600)] += 1
+            oldest = agg["oldest_unacked"]
+            if oldest and (m["oldest_unacked"] is None or oldest[0] < m["oldest_unacked"][0]):
+                m["oldest_unacked"] = oldest
+
+    statuses = sorted({s for m in merged.values() for s in m["status"]})
+    priorities = sorted({p for m in merged.values() for p in m["priority"]})
+
+    rows = []
+    for email, m in merged.items():
+        oldest = m["oldest_unacked"]
+        row = {
+            "Assignee": email,
+            "Open": sum(m["status"].values()),
+            "Unacked": m["unacked"],
+        }
+        row.update({f"Status: {s}": m["status"].get(s, 0) for s in statuses})
+        row.update({f"Priority: {p}": m["priority"].get(p, 0) for p in priorities})
+        row.update({f"Age {label}": m["age"].get(label, 0) for label, _ in AGE_BUCKETS})
+        row["Oldest Unacked (IST)"] = oldest[0].strftime("%Y-%m-%d %H:%M:%S") if oldest else ""
+        row["Oldest Unacked Age (h)"] = round((now - oldest[0]).total_seconds() / 3600, 1) if oldest else None
+        row["Oldest Unacked Incident"] = f"{oldest[1]} #{oldest[2]}" if oldest else ""
+        rows.append(row)
+
+    rows.sort(key=lambda x: (x["Unacked"], x["Open"]), reverse=True)
+    return rows
+
+# The open incidents behind one row of the summary, unacked and oldest first
+def assignee_incidents(email, selected_teams=None, now=None):
+    now = now or datetime.now(IST)
+
+    with _lock:
+        incidents = [
+            inc
+            for team_name, entry in _index.items()
+            if selected_teams is None or team_name in selected_teams
+            for inc in entry["assignees"].get(email, {}).get("incidents", [])
+        ]
+
+    incidents.sort(key=lambda inc: (inc["acked"], inc["created"] or now))
+    return [
+        {
+            "Team Name": inc["Team Name"],
+            "Counter ID": inc["Counter ID"],
+            "Message": inc["Message"],
+            "Priority": inc["Priority"],
+            "Status": inc["Status"],
+            "Acked": inc["acked"],
+            "Created (IST)": inc["created"].strftime("%Y-%m-%d %H:%M:%S") if inc["created"] else "",
+            "Age (h)": round((now - inc["created"]).total_seconds() / 3600, 1) if inc["created"] else None,
+        }
+        for inc in incidents
+    ]
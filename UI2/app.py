@@ -6,8 +6,8 @@ import streamlit as st
 import pandas as pd
 from datetime import date
 
-from spike_backend import fetch_incidents_for_range, generate_excel
-from open_alerts_backend import fetch_all_open_alerts, generate_excel as open_generate_excel
+from spike_backend import iter_incidents_for_range, generate_excel
+from open_alerts_backend import iter_open_alerts, generate_excel as open_generate_excel
 
 # -------------------------------------------------
 # PAGE CONFIG
@@ -68,6 +68,30 @@ page = st.sidebar.radio(
 # -------------------------------------------------
 st.title("Spike NOC Dashboard")
 
+# -------------------------------------------------
+# PROGRESSIVE FETCH
+# -------------------------------------------------
+def stream_rows(batches, label):
+    rows = []
+    status = st.empty()
+    table = st.empty()
+
+    try:
+        for team_name, team_rows in batches:
+            rows.extend(team_rows)
+            # only the newest team's rows are drawn, not the whole list again
+            status.caption(f"⏳ {team_name}: {len(team_rows)} {label} ({len(rows)} so far)")
+            if team_rows:
+                table.dataframe(pd.DataFrame(team_rows), use_container_width=True)
+    except RuntimeError as e:
+        st.error(f"⚠️ {e}")
+        st.stop()
+    finally:
+        status.empty()
+        table.empty()
+
+    return rows
+
 # -------------------------------------------------
 # INCIDENT REPORT
 # -------------------------------------------------
@@ -82,8 +106,7 @@ if page == "Incident Report":
         to_date = st.date_input("To Date", value=date.today())
 
     if st.button("Fetch Report"):
-        with st.spinner("Fetching incidents..."):
-            rows = fetch_incidents_for_range(from_date, to_date)
+        rows = stream_rows(iter_incidents_for_range(from_date, to_date), "incidents")
 
         if not rows:
             st.warning("No incidents found")
@@ -107,8 +130,7 @@ if page == "Open Alerts":
     st.subheader("🚨 Open Alerts (All Teams)")
 
     if st.button("Refresh Open Alerts"):
-        with st.spinner("Fetching open alerts..."):
-            rows = fetch_all_open_alerts()
+        rows = stream_rows(iter_open_alerts(), "open alerts")
 
         if not rows:
             st.success("🎉 No open alerts found")
@@ -2,25 +2,13 @@ import requests
 from openpyxl import Workbook
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import os
-from dotenv import load_dotenv
 import time
 
 # -------------------------------------------------
 # Load environment
 # -------------------------------------------------
-load_dotenv()
-
-SPIKE_API_KEY = os.getenv("SPIKE_API_KEY")
-
-teams = {
-    key.replace("TEAM_", ""): value
-    for key, value in os.environ.items()
-    if key.startswith("TEAM_")
-}
-
-if not SPIKE_API_KEY or not teams:
-    raise RuntimeError("SPIKE_API_KEY or TEAM_* variables missing in .env")
+# SPIKE_API_KEY / TEAM_* are read from .env on every fetch (spike_env)
+from spike_env import SPIKE_API_URL, load_config
 
 # -------------------------------------------------
 # Time helpers
@@ -42,7 +30,7 @@ def ist_str(dt):
 # -------------------------------------------------
 user_cache = {}
 
-def resolve_user(user_field, team_id):
+def resolve_user(user_field, team_id, api_key):
     if not user_field:
         return ""
 
@@ -57,9 +45,9 @@ def resolve_user(user_field, team_id):
         return user_cache[uid]
 
     r = requests.get(
-        f"https://api.spike.sh/users/{uid}",
+        f"{SPIKE_API_URL}/users/{uid}",
         headers={
-            "x-api-key": SPIKE_API_KEY,
+            "x-api-key": api_key,
             "x-team-id": team_id,
             "Accept": "application/json"
         }
@@ -81,17 +69,24 @@ def resolve_user(user_field, team_id):
 # FETCH ALL OPEN ALERTS (ALL TEAMS)
 # -------------------------------------------------
 def fetch_all_open_alerts():
-    rows = []
+    return [row for _, team_rows in iter_open_alerts() for row in team_rows]
+
+# Yields (team_name, rows) as each team is fetched, so the page can show
+# teams as they arrive
+def iter_open_alerts():
+    api_key, teams = load_config()
 
     for team_name, team_id in teams.items():
+        rows = []
         headers = {
-            "x-api-key": SPIKE_API_KEY,
+            "x-api-key": api_key,
             "x-team-id": team_id,
             "Accept": "application/json"
         }
 
-        resp = requests.get("https://api.spike.sh/incidents", headers=headers)
+        resp = requests.get(f"{SPIKE_API_URL}/incidents", headers=headers)
         if resp.status_code != 200:
+            yield team_name, rows
             continue
 
         incidents = resp.json().get("incidents", resp.json())
@@ -107,7 +102,7 @@ def fetch_all_open_alerts():
             for note in grouped.get("notes", []):
                 note_dt = utc_to_ist(note.get("createdAt"))
                 if note_dt:
-                    user = resolve_user(note.get("user"), team_id)
+                    user = resolve_user(note.get("user"), team_id, api_key)
                     content = note.get("content", "").replace("\n", " ")
                     notes.append(
                         f"{ist_str(note_dt)} | {user}: {content}"
@@ -128,7 +123,7 @@ def fetch_all_open_alerts():
                 "Notes": "\n".join(notes)
             })
 
-    return rows
+        yield team_name, rows
 
 # -------------------------------------------------
 # GENERATE EXCEL
@@ -2,19 +2,9 @@ import requests
 from openpyxl import Workbook
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import os
-from dotenv import load_dotenv
 import time
 
-load_dotenv()
-
-SPIKE_API_KEY = os.getenv("SPIKE_API_KEY")
-
-teams = {
-    key.replace("TEAM_", ""): value
-    for key, value in os.environ.items()
-    if key.startswith("TEAM_")
-}
+from spike_env import SPIKE_API_URL, load_config
 
 def utc_to_ist(utc_time_str):
     if not utc_time_str:
@@ -30,7 +20,7 @@ def ist_str(dt):
 
 user_cache = {}
 
-def resolve_user(user_field, team_id):
+def resolve_user(user_field, team_id, api_key):
     if not user_field:
         return ""
 
@@ -45,9 +35,9 @@ def resolve_user(user_field, team_id):
         return user_cache[uid]
 
     r = requests.get(
-        f"https://api.spike.sh/users/{uid}",
+        f"{SPIKE_API_URL}/users/{uid}",
         headers={
-            "x-api-key": SPIKE_API_KEY,
+            "x-api-key": api_key,
             "x-team-id": team_id
         }
     )
@@ -62,18 +52,25 @@ def resolve_user(user_field, team_id):
     return name
 
 def fetch_incidents_for_range(from_date, to_date):
-    rows = []
+    return [row for _, team_rows in iter_incidents_for_range(from_date, to_date) for row in team_rows]
+
+# Yields (team_name, rows) as each team is fetched, so the page can show
+# teams as they arrive
+def iter_incidents_for_range(from_date, to_date):
+    api_key, teams = load_config()
 
     for team_name, team_id in teams.items():
+        rows = []
         resp = requests.get(
-            "https://api.spike.sh/incidents",
+            f"{SPIKE_API_URL}/incidents",
             headers={
-                "x-api-key": SPIKE_API_KEY,
+                "x-api-key": api_key,
                 "x-team-id": team_id
             }
         )
 
         if resp.status_code != 200:
+            yield team_name, rows
             continue
 
         for inc in resp.json().get("incidents", []):
@@ -87,7 +84,7 @@ def fetch_incidents_for_range(from_date, to_date):
                 if note_dt:
                     notes.append(
                         f"{ist_str(note_dt)} | "
-                        f"{resolve_user(note.get('user'), team_id)}: "
+                        f"{resolve_user(note.get('user'), team_id, api_key)}: "
                         f"{note.get('content','')}"
                     )
 
@@ -102,7 +99,7 @@ def fetch_incidents_for_range(from_date, to_date):
                 "Notes": "\n".join(notes)
             })
 
-    return rows
+        yield team_name, rows
 
 def generate_excel(rows, from_date, to_date):
     wb = Workbook()
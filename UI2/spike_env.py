@@ -0,0 +1,29 @@
+import os
+from dotenv import dotenv_values, find_dotenv
+
+# -------------------------------------------------
+# Environment
+# -------------------------------------------------
+# .env is re-read on every call instead of being loaded into os.environ
+# once at import, so teams added to or removed from it show up on the next
+# fetch without a restart. Real environment variables still win over .env,
+# as with load_dotenv().
+def read_env():
+    env_file = find_dotenv()
+    values = dotenv_values(env_file) if env_file else {}
+    return {**values, **os.environ}
+
+def load_config():
+    env = read_env()
+    api_key = env.get("SPIKE_API_KEY")
+    teams = {
+        key.replace("TEAM_", ""): value
+        for key, value in env.items()
+        if key.startswith("TEAM_")
+    }
+
+    if not api_key or not teams:
+        raise RuntimeError("SPIKE_API_KEY or TEAM_* variables missing in .env")
+    return api_key, teams
+
+SPIKE_API_URL = (read_env().get("SPIKE_API_URL") or "https://api.spike.sh").rstrip("/")
@@ -0,0 +1,158 @@
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# -------------------------------------------------
+# Mock of the two Spike endpoints the dashboards use:
+#   GET /incidents      (x-team-id header picks the team)
+#   GET /users/<uid>
+# -------------------------------------------------
+
+STATUSES = ["triggered", "acknowledged", "resolved"]
+PRIORITIES = ["p1", "p2", "p3", "p4", "p5"]
+
+
+def utc_str(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def build_incidents(team_id, count, users):
+    rnd = random.Random(team_id)
+    now = datetime.now(timezone.utc)
+    incidents = []
+
+    for i in range(count):
+        nack = now - timedelta(minutes=rnd.randint(1, 12 * 60))
+        status = rnd.choice(STATUSES)
+        incidents.append({
+            "counterId": i + 1,
+            "message": f"[{team_id}] mock alert {i + 1} " + "x" * rnd.randint(20, 200),
+            "status": status,
+            "NACK_at": utc_str(nack),
+            "ACK_at": utc_str(nack + timedelta(minutes=5)) if status != "triggered" else None,
+            "RES_at": utc_str(nack + timedelta(minutes=30)) if status == "resolved" else None,
+            "assignee": [{"email": f"{u}@example.com"} for u in rnd.sample(users, rnd.randint(1, 2))],
+            "metadata": {"priority": rnd.choice(PRIORITIES)},
+            "integration": {"name": rnd.choice(["grafana", "cloudwatch", "uptime"])},
+            "groupedIncident": {"notes": [
+                {
+                    "createdAt": utc_str(nack + timedelta(minutes=n + 1)),
+                    "user": rnd.choice(users),
+                    "content": f"note {n + 1}\nchecking",
+                }
+                for n in range(rnd.randint(0, 3))
+            ]},
+        })
+
+    return incidents
+
+
+class MockSpike:
+    def __init__(self, teams, incidents_per_team, users, latency, churn):
+        self.latency = latency
+        self.churn = churn
+        self.users = [f"user{i}" for i in range(users)]
+        self.incidents = {
+            team_id: build_incidents(team_id, incidents_per_team, self.users)
+            for team_id in teams
+        }
+        self.version = {team_id: 1 for team_id in teams}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def incidents_body(self, team_id):
+        with self.lock:
+            self.requests += 1
+            # churn: probability that a team's listing changed since the last request
+            if self.churn and random.random() < self.churn:
+                self.version[team_id] += 1
+            version = self.version[team_id]
+        body = json.dumps({"incidents": self.incidents[team_id]}).encode()
+        return body, f'"{team_id}-v{version}"'
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, body, etag=None):
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=1)
+                encoding = "gzip"
+            else:
+                encoding = None
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if mock.latency:
+                time.sleep(mock.latency)
+
+            if self.path.startswith("/users/"):
+                uid = self.path.rsplit("/", 1)[-1]
+                self.send_body(json.dumps({
+                    "firstName": uid.capitalize(),
+                    "lastName": "Mock",
+                    "email": f"{uid}@example.com",
+                }).encode())
+                return
+
+            team_id = self.headers.get("x-team-id")
+            if self.path.split("?")[0] != "/incidents" or team_id not in mock.incidents:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            body, etag = mock.incidents_body(team_id)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_body(body, etag)
+
+    return Handler
+
+
+def start(teams, incidents_per_team=200, users=20, latency=0.05, churn=0.0, port=0):
+    mock = MockSpike(teams, incidents_per_team, users, latency, churn)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, mock
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Spike API for load testing")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--incidents", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--churn", type=float, default=0.0)
+    args = parser.parse_args()
+
+    team_ids = [f"team{i}" for i in range(args.teams)]
+    server, _ = start(team_ids, args.incidents, latency=args.latency, churn=args.churn, port=args.port)
+    print(f"Mock Spike on http://127.0.0.1:{server.server_address[1]} with teams: {', '.join(team_ids)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
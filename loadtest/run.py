@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_spike
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -------------------------------------------------
+# Starts a real `streamlit run <app>/app.py` server against the mock Spike
+# backend and drives it with N simulated NOC users, each one a websocket
+# session speaking the same protocol as the browser, stepping N up until
+# latency or throughput stops scaling. CPU and RSS are sampled for the
+# server process only.
+#
+#   python loadtest/run.py --app UI --app UI2 --users 1,2,4,8,16
+# -------------------------------------------------
+
+# -------------------------------------------------
+# SERVER
+# -------------------------------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, env, work_dir, timeout=60):
+    port = free_port()
+    log = open(os.path.join(work_dir, "streamlit.log"), "w")
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, app, "app.py"),
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with {proc.returncode}, see {log.name}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                if resp.status == 200:
+                    return proc, port
+        except OSError:
+            time.sleep(0.2)
+
+    proc.kill()
+    raise RuntimeError(f"streamlit did not become healthy in {timeout}s, see {log.name}")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+# -------------------------------------------------
+# RESOURCE SAMPLER (SERVER PID)
+# -------------------------------------------------
+def proc_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        # fields after the ")" of the command name; utime/stime are 14/15
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def proc_rss_mb(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class Sampler(threading.Thread):
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.cpu = []
+        self.rss = []
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            last_cpu = proc_cpu_seconds(self.pid)
+            last_wall = time.perf_counter()
+            while not self.stop_event.wait(self.interval):
+                cpu = proc_cpu_seconds(self.pid)
+                wall = time.perf_counter()
+                self.cpu.append(100 * (cpu - last_cpu) / (wall - last_wall))
+                self.rss.append(proc_rss_mb(self.pid))
+                last_cpu, last_wall = cpu, wall
+        except OSError:
+            # server died; run_level reports that through the users' errors
+            pass
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+# -------------------------------------------------
+# WEBSOCKET SESSION
+# -------------------------------------------------
+class ActionError(Exception):
+    pass
+
+
+# One browser tab: reruns the script with the widget states the frontend
+# would send and collects the elements of each run.
+class Session:
+    def __init__(self, ws, timeout):
+        self.ws = ws
+        self.timeout = timeout
+        self.page_script_hash = ""
+        self.widgets = []
+        self.states = {}
+        self.app_errors = []
+
+    async def rerun(self, changed=()):
+        for state in changed:
+            self.states[state.id] = state
+
+        live = {w.id for _, w in self.widgets}
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_script_hash
+        msg.rerun_script.widget_states.widgets.extend(
+            s for wid, s in self.states.items() if wid in live or s in changed
+        )
+        # buttons are one-shot, like in the browser
+        for state in changed:
+            if state.WhichOneof("value") == "trigger_value":
+                del self.states[state.id]
+
+        await self.ws.send(msg.SerializeToString())
+        try:
+            await asyncio.wait_for(self._read_run(), self.timeout)
+        except asyncio.TimeoutError:
+            raise ActionError(f"no script_finished within {self.timeout:g}s") from None
+
+    async def _read_run(self):
+        widgets, app_errors = [], []
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+
+            if kind == "new_session":
+                self.page_script_hash = msg.new_session.page_script_hash
+                widgets, app_errors = [], []
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in ("button", "radio", "multiselect"):
+                    widgets.append((element_type, getattr(element, element_type)))
+                elif element_type == "exception":
+                    app_errors.append(f"{element.exception.type}: {element.exception.message}")
+                elif element_type == "alert" and element.alert.format == element.alert.ERROR:
+                    app_errors.append(element.alert.body)
+            elif kind == "script_finished":
+                status = msg.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise ActionError("script compile error")
+                self.widgets, self.app_errors = widgets, app_errors
+                return
+
+    def find(self, element_type, label=None):
+        return next(
+            (w for t, w in self.widgets if t == element_type and (label is None or w.label == label)),
+            None,
+        )
+
+# -------------------------------------------------
+# SIMULATED USER
+# -------------------------------------------------
+def click(label):
+    async def action(session, rnd):
+        button = session.find("button", label)
+        if button is None:
+            return False
+        await session.rerun([WidgetState(id=button.id, trigger_value=True)])
+        return True
+    return action
+
+
+def switch_page(page):
+    async def action(session, rnd):
+        radio = session.find("radio")
+        if radio is None or page not in radio.options:
+            return False
+        await session.rerun([WidgetState(id=radio.id, string_value=page)])
+        return True
+    return action
+
+
+def change_team_filter():
+    async def action(session, rnd):
+        select = session.find("multiselect")
+        if select is None:
+            return False
+        teams = [o for o in select.options if o != "All Teams"]
+        picked = rnd.sample(teams, rnd.randint(1, len(teams))) if teams and rnd.random() < 0.7 else ["All Teams"]
+        state = WidgetState(id=select.id)
+        state.string_array_value.data[:] = picked
+        await session.rerun([state])
+        return True
+    return action
+
+
+USER_SCRIPT = [
+    ("switch_to_report", switch_page("Incident Report")),
+    ("fetch_report", click("Fetch Report")),
+    ("filter_report", change_team_filter()),
+    ("switch_to_open", switch_page("Open Alerts")),
+    ("refresh_open", click("Refresh Open Alerts")),
+    ("filter_open", change_team_filter()),
+    ("switch_to_load", switch_page("On-call Load")),
+    ("filter_load", change_team_filter()),
+]
+
+
+# Every planned action is either timed, skipped (its widget isn't on the
+# page, e.g. UI2 has no On-call Load view), failed (timed out or the app
+# showed an error) or dropped: the one in flight when the user's websocket
+# died and everything a timed-out or dead user never got to. Failed +
+# dropped count as errors.
+async def simulate_user(url, rounds, timeout, result, seed):
+    rnd = random.Random(seed)
+    planned = 1 + rounds * len(USER_SCRIPT)
+    done = 0
+
+    async def timed(name, action):
+        start = time.perf_counter()
+        try:
+            ran = await action(session, rnd)
+        except ActionError:
+            # the session is out of step with the server now, so give up on it
+            result["failed"] += 1
+            raise
+        if ran is False:
+            result["skipped"] += 1
+            return
+        result["samples"].append((name, time.perf_counter() - start))
+        if session.app_errors:
+            result["failed"] += 1
+        for error in session.app_errors:
+            result["errors"].append(f"{name}: {error}")
+
+    async def initial_load(session, rnd):
+        await session.rerun()
+
+    try:
+        async with websockets.connect(
+            url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout
+        ) as ws:
+            session = Session(ws, timeout)
+            await timed("initial_load", initial_load)
+            done += 1
+            for _ in range(rounds):
+                for name, action in USER_SCRIPT:
+                    await timed(name, action)
+                    done += 1
+                    await asyncio.sleep(rnd.uniform(0, 0.2))
+    except ActionError as e:
+        done += 1
+        result["errors"].append(f"user {seed} gave up after {done}/{planned} actions: {e}")
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+        result["errors"].append(f"user {seed} died after {done}/{planned} actions: {e!r}")
+    finally:
+        result["dropped"] += planned - done
+
+# -------------------------------------------------
+# LOAD LEVELS
+# -------------------------------------------------
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def run_users(url, users, rounds, timeout, result):
+    await asyncio.gather(*(
+        simulate_user(url, rounds, timeout, result, i) for i in range(users)
+    ))
+
+
+def run_level(url, pid, users, rounds, timeout):
+    result = {"samples": [], "errors": [], "failed": 0, "skipped": 0, "dropped": 0}
+    sampler = Sampler(pid)
+    sampler.start()
+
+    start = time.perf_counter()
+    asyncio.run(run_users(url, users, rounds, timeout, result))
+    wall = time.perf_counter() - start
+    sampler.stop()
+
+    samples = result["samples"]
+    latencies = [s for _, s in samples]
+    return {
+        "users": users,
+        "actions": len(samples),
+        "skipped": result["skipped"],
+        "dropped": result["dropped"],
+        "errors": result["errors"],
+        "error_count": result["failed"] + result["dropped"],
+        "throughput": len(samples) / wall if wall else 0,
+        "p50": percentile(latencies, 50) if latencies else 0,
+        "p95": percentile(latencies, 95) if latencies else 0,
+        "p99": percentile(latencies, 99) if latencies else 0,
+        "by_action": {
+            name: [s for n, s in samples if n == name]
+            for name in sorted({n for n, _ in samples})
+        },
+        "cpu_avg": statistics.mean(sampler.cpu) if sampler.cpu else 0,
+        "cpu_max": max(sampler.cpu, default=0),
+        "rss_max": max(sampler.rss, default=0),
+    }
+
+
+def print_level(level):
+    print(
+        f"\n== {level['users']} users: {level['actions']} actions, "
+        f"{level['throughput']:.2f} actions/s, {level['error_count']} errors "
+        f"({level['dropped']} dropped), {level['skipped']} skipped, "
+        f"server CPU avg {level['cpu_avg']:.0f}% max {level['cpu_max']:.0f}%, "
+        f"RSS max {level['rss_max']:.0f} MB"
+    )
+    print(f"   {'action':<18}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, values in level["by_action"].items():
+        print(
+            f"   {name:<18}{len(values):>5}"
+            f"{percentile(values, 50) * 1000:>10.0f}"
+            f"{percentile(values, 95) * 1000:>10.0f}"
+            f"{percentile(values, 99) * 1000:>10.0f}"
+        )
+    for error in level["errors"][:5]:
+        print(f"   ! {error}")
+
+
+# Saturated once adding users no longer adds throughput, p95 latency has
+# grown past p95_factor x the single-level baseline, or actions fail.
+def find_saturation(levels, p95_factor):
+    baseline = levels[0]["p95"]
+    for prev, level in zip(levels, levels[1:]):
+        if level["error_count"] and not prev["error_count"]:
+            return level, "actions started failing"
+        if level["throughput"] < prev["throughput"] * 1.1:
+            return level, "throughput stopped scaling"
+        if baseline and level["p95"] > baseline * p95_factor:
+            return level, f"p95 above {p95_factor:g}x baseline"
+    return None, None
+
+
+def run_app(app, args):
+    team_ids = [f"loadtest{i}" for i in range(args.teams)]
+    server, mock = mock_spike.start(
+        team_ids, args.incidents, latency=args.latency, churn=args.churn
+    )
+
+    env = {k: v for k, v in os.environ.items() if not k.startswith("TEAM_")}
+    env["SPIKE_API_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    env["SPIKE_API_KEY"] = "loadtest"
+    for i, team_id in enumerate(team_ids):
+        env[f"TEAM_LOADTEST{i}"] = team_id
+
+    # the apps load logo.png and write Excel files relative to the cwd, so run
+    # from a scratch dir to keep the generated reports out of the repo
+    work_dir = tempfile.mkdtemp(prefix=f"spike_loadtest_{app}_")
+    shutil.copy(os.path.join(ROOT, app, "logo.png"), work_dir)
+    proc, port = start_server(app, env, work_dir)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+
+    print(f"### {app}: {args.teams} teams x {args.incidents} incidents, "
+          f"{args.latency * 1000:.0f} ms upstream latency, {os.cpu_count()} CPUs, "
+          f"server pid {proc.pid}")
+
+    try:
+        # cold user/ETag caches would otherwise make the first level look slow
+        run_level(url, proc.pid, 1, 1, args.timeout)
+
+        levels = []
+        for users in args.users:
+            level = run_level(url, proc.pid, users, args.rounds, args.timeout)
+            levels.append(level)
+            print_level(level)
+            if proc.poll() is not None:
+                print(f"\n>>> {app} server exited with {proc.returncode}")
+                break
+    finally:
+        stop_server(proc)
+        server.shutdown()
+
+    saturated, reason = find_saturation(levels, args.p95_factor)
+    if saturated:
+        print(f"\n>>> {app} saturates at {saturated['users']} users ({reason})")
+    else:
+        print(f"\n>>> {app} did not saturate up to {levels[-1]['users']} users")
+    print(f"    mock Spike served {mock.requests} incident listings")
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-user load test for the Spike dashboards")
+    parser.add_argument("--app", action="append", choices=["UI", "UI2"], help="app dir (repeatable, default both)")
+    parser.add_argument("--users", default="1,2,4,8,16", help="comma-separated concurrent user levels")
+    parser.add_argument("--rounds", type=int, default=3, help="script repetitions per user")
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--incidents", type=int, default=200, help="incidents per team")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency (s)")
+    parser.add_argument("--churn", type=float, default=0.2, help="chance a team listing changed per request")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout (s)")
+    parser.add_argument("--p95-factor", type=float, default=3.0)
+    args = parser.parse_args()
+    args.users = [int(u) for u in args.users.split(",")]
+
+    for app in args.app or ["UI", "UI2"]:
+        run_app(app, args)
+
+
+if __name__ == "__main__":
+    main()